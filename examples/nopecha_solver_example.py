@@ -12,6 +12,9 @@ from nocaptchaai_playwright.solver import Solver
 
 API_KEY: str = "your-api-key"
 API_URL: str = "https://pro.nocaptchaai.com/api/solve"  # Specify API URL (pro or not).
+STATS_PATH: str = "nocaptchaai_stats.json"  # Per-prompt statistics, kept between runs.
+SOAK_TEST: bool = False  # Report memory growth and latency drift every REPORT_EVERY solves.
+REPORT_EVERY: int = 100
 
 
 async def main() -> None:
@@ -26,16 +29,23 @@ async def main() -> None:
 
     os.environ["API_KEY"] = API_KEY
     os.environ["API_URL"] = API_URL
+    os.environ["STATS_PATH"] = STATS_PATH
 
-    captcha_solver = Solver()
+    async with Solver(soak=SOAK_TEST) as captcha_solver:
+        solves: int = 0
 
-    while True:
-        await page.goto(
-            "https://nopecha.com/demo/hcaptcha",
-            wait_until="networkidle",
-        )
-        solve_status = await captcha_solver.solve(page)
-        await page.wait_for_timeout(1000)
+        while True:
+            await page.goto(
+                "https://nopecha.com/demo/hcaptcha",
+                wait_until="networkidle",
+            )
+            solve_status = await captcha_solver.solve(page)
+            await page.wait_for_timeout(1000)
+
+            solves += 1
+
+            if SOAK_TEST and solves % REPORT_EVERY == 0:
+                print(captcha_solver.soak_report())
 
 
 if __name__ == "__main__":
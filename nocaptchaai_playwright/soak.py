@@ -0,0 +1,141 @@
+import gc
+import tracemalloc
+from collections import deque
+
+# Tracing is process-wide, so it is shared by every monitor and only stopped
+# once the last one closes, and only if a monitor was the one to start it.
+_monitors: int = 0
+_started_tracing: bool = False
+
+
+class SoakMonitor:
+    """
+    Tracks memory growth and per-solve latency drift over long runs.
+    Only the first and the most recent windows of latencies are kept,
+    so the monitor itself uses bounded memory no matter how long it runs.
+    """
+
+    def __init__(
+        self,
+        window: int = 50,
+    ) -> None:
+        """
+        Initializes the monitor and starts tracing memory allocations.
+
+        Args:
+            window (int): Number of solves averaged when comparing early and recent latency.
+        """
+        self.window = window
+        self.solves: int = 0
+        self.first_latencies: list[float] = []
+        self.recent_latencies: deque[float] = deque(maxlen=window)
+        self.baseline_memory: int | None = None
+        self.peak_memory: int = 0
+        self.closed: bool = False
+
+        global _monitors, _started_tracing
+
+        if not tracemalloc.is_tracing():
+            tracemalloc.start()
+            _started_tracing = True
+
+        _monitors += 1
+
+    def record(
+        self,
+        latency: float,
+    ) -> None:
+        """
+        Records the latency of a solve and the memory in use after it.
+
+        Args:
+            latency (float): Seconds spent on the solve.
+        """
+        self.solves += 1
+
+        if len(self.first_latencies) < self.window:
+            self.first_latencies.append(latency)
+
+        self.recent_latencies.append(latency)
+
+        if not tracemalloc.is_tracing():
+            return
+
+        memory: int = self.current_memory()
+        self.peak_memory = max(self.peak_memory, memory)
+
+        # The first solve warms up imports and caches, so it is used as the baseline.
+        if self.baseline_memory is None:
+            self.baseline_memory = memory
+
+    @staticmethod
+    def current_memory() -> int:
+        """
+        Gets the memory currently allocated by Python, after a garbage collection.
+
+        Returns:
+            int: Allocated memory in bytes.
+        """
+        gc.collect()
+
+        return tracemalloc.get_traced_memory()[0]
+
+    def report(
+        self,
+    ) -> dict[str, float] | None:
+        """
+        Builds a report of memory growth and latency drift since the first solve.
+
+        Returns:
+            dict[str, float] | None: Memory in bytes and latencies in seconds,
+                or None if memory is no longer being traced.
+        """
+        if not tracemalloc.is_tracing():
+            return None
+
+        if not self.solves:
+            return {"solves": 0}
+
+        memory: int = self.current_memory()
+
+        # No sample was taken while tracing was off, so the baseline starts now.
+        if self.baseline_memory is None:
+            self.baseline_memory = memory
+
+        self.peak_memory = max(self.peak_memory, memory)
+        memory_growth: int = memory - self.baseline_memory
+
+        first_latency: float = sum(self.first_latencies) / len(self.first_latencies)
+        recent_latency: float = sum(self.recent_latencies) / len(self.recent_latencies)
+
+        return {
+            "solves": self.solves,
+            "baseline_memory": self.baseline_memory,
+            "current_memory": memory,
+            "peak_memory": self.peak_memory,
+            "memory_growth": memory_growth,
+            # The baseline is taken after the first solve, so it doesn't count.
+            "memory_growth_per_solve": memory_growth / max(self.solves - 1, 1),
+            "first_latency": first_latency,
+            "recent_latency": recent_latency,
+            "latency_drift": recent_latency - first_latency,
+        }
+
+    def close(
+        self,
+    ) -> None:
+        """
+        Stops tracing memory allocations once the last monitor closes,
+        if tracing was started by a monitor.
+        """
+        global _monitors, _started_tracing
+
+        if self.closed:
+            return
+
+        self.closed = True
+        _monitors -= 1
+
+        if _monitors == 0 and _started_tracing:
+            tracemalloc.stop()
+            _started_tracing = False
@@ -1,3 +1,4 @@
+import asyncio
 import base64
 import random
 import re
@@ -9,42 +10,133 @@ from playwright.async_api import (
     Locator,
     FrameLocator,
     TimeoutError,
+    Error,
     Frame,
     ElementHandle,
 )
 import os
+import time
+
+from nocaptchaai_playwright.soak import SoakMonitor
+from nocaptchaai_playwright.stats import PromptStats
 
 # Captcha xpath selectors.
 CHECKBOX_CHALLENGE: str = "(//iframe[contains(@title,'checkbox')])[1]"
+CHECKBOX_CHECKED: str = "//div[@id='checkbox'][@aria-checked='true']"
 HOOK_CHALLENGE: str = "(//iframe[contains(@title,'content')])[1]"
 PROMPT_TEXT: str = "(//h2[@class='prompt-text'])[1]"
 CAPTCHA_FINAL_BUTTON: str = "(//div[@class='button-submit button'])[1]"
 CAPTCHA_REFRESH_BUTTON: str = "(//div[@class='refresh button'])[1]"
 TASK_IMAGE: str = "//div[@class='task-image']"
+CHALLENGE_ANSWER: str = (
+    "//div[contains(concat(' ', normalize-space(@class), ' '), ' challenge-answer ')]"
+)
 
 
 class Solver:
     page: Page = None
+    checkbox_frame: FrameLocator = None
     user_agent: str = None
 
     API_KEY: str = None
     API_URL: str = None
 
     solved: bool = False
+    captcha_is_open: bool = False
+    checkbox_clicked: bool = False
     target: str = None
     captcha_type: int = None
 
-    def __init__(self, api_key: str = None, api_url: str = None) -> None:
+    stats: PromptStats = None
+    rounds: int = 0
+    attempt: tuple[str, int, float] | None = None
+
+    soak: SoakMonitor | None = None
+
+    def __init__(
+        self,
+        api_key: str = None,
+        api_url: str = None,
+        stats: PromptStats = None,
+        soak: bool = False,
+    ) -> None:
         """
         Initializes the Solver object. Sets the API key and API url.
         If the api_key and api_url are not provided, it will try to get them from the environment variables.
+        If stats is not provided, the store shared by all solvers is used, persisted to STATS_PATH if set.
 
         Args:
             api_key (str | None): The API key for the captcha solver.
             api_url (str | None): The API url for the captcha solver.
+            stats (PromptStats | None): The per-prompt statistics store.
+            soak (bool): Whether to track memory growth and latency drift across solves.
         """
         self.API_KEY = api_key if api_key is not None else os.getenv("API_KEY")
         self.API_URL = api_url if api_url is not None else os.getenv("API_URL")
+        self.stats = (
+            stats if stats is not None else PromptStats.shared(os.getenv("STATS_PATH"))
+        )
+        self.soak = SoakMonitor() if soak else None
+
+    async def __aenter__(
+        self,
+    ) -> "Solver":
+        return self
+
+    async def __aexit__(
+        self,
+        *exc_info,
+    ) -> None:
+        self.close()
+
+    def reset(
+        self,
+    ) -> None:
+        """
+        Clears the state left by a previous solve, so the solver can be reused.
+        """
+        self.solved = False
+        self.captcha_is_open = False
+        self.checkbox_clicked = False
+        self.target = None
+        self.captcha_type = None
+        self.rounds = 0
+        self.attempt = None
+
+    def release(
+        self,
+    ) -> None:
+        """
+        Drops the references to the page and frame of the last solve.
+        """
+        self.page = None
+        self.checkbox_frame = None
+        self.target = None
+        self.captcha_type = None
+        self.attempt = None
+
+    def close(
+        self,
+    ) -> None:
+        """
+        Releases the solver and saves the statistics. Called when leaving an async with block.
+        """
+        self.release()
+        self.stats.save()
+
+        if self.soak is not None:
+            self.soak.close()
+
+    def soak_report(
+        self,
+    ) -> dict[str, float] | None:
+        """
+        Gets the memory growth and latency drift report, if soak mode is on.
+
+        Returns:
+            dict[str, float] | None: The report, or None if soak mode is off.
+        """
+        return self.soak.report() if self.soak is not None else None
 
     async def identify_challenge(
         self,
@@ -58,6 +150,8 @@ class Solver:
         """
         target: str = self.target.lower().strip()
 
+        self.captcha_type = None
+
         # TODO Improve method of checking captcha version.
         # Check if keywords are present in the target.
         if "please click each image containing" in target:
@@ -109,6 +203,7 @@ class Solver:
             # Click the captcha checkbox if it is visible.
             if await checkbox.is_visible():
                 await checkbox.click()
+                self.checkbox_clicked = True
 
             await self.page.wait_for_timeout(1000)
 
@@ -126,6 +221,75 @@ class Solver:
 
         return True
 
+    async def refresh_challenge(
+        self,
+    ) -> None:
+        """
+        Clicks the refresh button to get a new challenge.
+        """
+        refresh_button: Locator = self.checkbox_frame.locator(CAPTCHA_REFRESH_BUTTON)
+
+        if not refresh_button:
+            return
+
+        await refresh_button.click()
+
+        await self.page.wait_for_timeout(1000)
+
+    def start_attempt(
+        self,
+    ) -> None:
+        """
+        Starts tracking an attempt on the current prompt.
+        It is only recorded if at least one API round is spent on it.
+        """
+        self.rounds = 0
+        self.attempt = (self.target, self.captcha_type, time.monotonic())
+
+    def finish_attempt(
+        self,
+        solved: bool,
+    ) -> None:
+        """
+        Records the outcome of the attempt being tracked, if there is one.
+
+        Args:
+            solved (bool): Whether the captcha was solved.
+        """
+        if self.attempt is None:
+            return
+
+        target, captcha_type, started = self.attempt
+        self.attempt = None
+
+        # Nothing was spent, so the attempt says nothing about the prompt's yield.
+        if self.rounds == 0:
+            return
+
+        self.stats.record_attempt(
+            target,
+            captcha_type,
+            solved,
+            self.rounds,
+            time.monotonic() - started,
+        )
+
+    async def is_checkbox_checked(
+        self,
+    ) -> bool:
+        """
+        Checks if the captcha checkbox is marked as solved.
+
+        Returns:
+            bool: True if the checkbox is checked, False otherwise.
+        """
+        try:
+            return await self.page.frame_locator(CHECKBOX_CHALLENGE).locator(
+                CHECKBOX_CHECKED,
+            ).count() > 0
+        except Error:
+            return False
+
     async def solve_hcaptcha_grid(
         self,
     ) -> None:
@@ -186,6 +350,7 @@ class Solver:
         }
 
         # Post the problem and get the solution.
+        self.rounds += 1
         r: Response = requests.post(
             url=self.API_URL,
             headers={
@@ -221,14 +386,7 @@ class Solver:
                 await self.solve_hcaptcha_grid()
 
         elif r.json()["status"] in ["skip", "error"]:
-            refresh_button = self.checkbox_frame.locator(CAPTCHA_REFRESH_BUTTON)
-
-            if not refresh_button:
-                return
-
-            refresh_button.click()
-
-            await self.page.wait_for_timeout(1000)
+            await self.refresh_challenge()
 
         return
 
@@ -319,6 +477,7 @@ class Solver:
         }
 
         # Post the problem.
+        self.rounds += 1
         post_response: Response = requests.post(
             url=self.API_URL,
             headers={
@@ -349,14 +508,7 @@ class Solver:
             )
 
             if solve_response.json()["status"] in ["error", "skip"]:
-                refresh_button = self.checkbox_frame.locator(CAPTCHA_REFRESH_BUTTON)
-
-                if not refresh_button:
-                    return
-
-                refresh_button.click()
-
-                await self.page.wait_for_timeout(1000)
+                await self.refresh_challenge()
 
                 return
 
@@ -386,12 +538,56 @@ class Solver:
             await button.click()
             await self.solve_hcaptcha_bbox()
 
-    # TODO - Still needs testing. Logic is all there but is untested.
+    @staticmethod
+    def image_url(
+        style: str | None,
+    ) -> str | None:
+        """
+        Extracts the image url from the style of an image div.
+
+        Args:
+            style (str | None): The style attribute, e.g. 'background: url("...")'.
+
+        Returns:
+            str | None: The image url, or None if the style has no url.
+        """
+        match: re.Match | None = re.search(r"url\([\"']?(.*?)[\"']?\)", style or "")
+
+        return match.group(1) if match else None
+
+    async def fetch_image_base64(
+        self,
+        url: str,
+        headers: dict[str, str],
+    ) -> str:
+        """
+        Downloads an image without blocking the event loop and encodes it in base64.
+
+        Args:
+            url (str): The url of the image.
+            headers (dict[str, str]): The headers to send with the request.
+
+        Returns:
+            str: The image encoded in base64.
+
+        Raises:
+            requests.RequestException: If the image could not be downloaded.
+        """
+        response: Response = await asyncio.to_thread(
+            requests.get,
+            url,
+            headers=headers,
+        )
+
+        response.raise_for_status()
+
+        return base64.b64encode(response.content).decode("utf-8")
+
     async def solve_hcaptcha_multi(
         self,
     ) -> None:
         """
-        Solves the captcha challenge of type Multi Selection (type = 2).
+        Solves the captcha challenge of type Multiple Choice (type = 2).
         """
         await self.page.wait_for_timeout(1000)
 
@@ -399,19 +595,35 @@ class Solver:
             self.solved = True
             return
 
-        image: Locator = self.checkbox_frame.locator(
-            TASK_IMAGE,
-        )
-
-        # Get image url.
-        image_style: str | None = await image.locator(
-            "div.image",
-        ).get_attribute("style")
+        choices: Locator = self.checkbox_frame.locator(CHALLENGE_ANSWER)
 
-        if image_style is None:
+        try:
+            # The answers are read without waiting, so make sure they have rendered.
+            await choices.first.wait_for(state="visible", timeout=5000)
+
+            # Read the example image and every choice in one go.
+            image_style, choices_info = await asyncio.gather(
+                self.checkbox_frame.locator(TASK_IMAGE)
+                .first.locator("div.image")
+                .get_attribute("style", timeout=5000),
+                choices.evaluate_all(
+                    """
+                    (choices) => choices.map((choice) => ({
+                        text: choice.querySelector(".text-content")?.innerText ?? "",
+                        style: choice.querySelector(".image")?.getAttribute("style") ?? null,
+                    }))
+                    """
+                ),
+            )
+        except TimeoutError:
+            await self.refresh_challenge()
             return
 
-        url: str = re.split(r'[(")]', image_style)[2]
+        image_url: str | None = self.image_url(image_style)
+
+        if image_url is None or not choices_info:
+            await self.refresh_challenge()
+            return
 
         headers: dict[str, str] = {
             "Authority": "hcaptcha.com",
@@ -425,60 +637,33 @@ class Solver:
             "User-Agent": self.user_agent,
         }
 
-        # Process base64 of image.
-        img_base64: bytes = base64.b64encode(
-            requests.get(
-                url,
-                headers=headers,
-            ).content
-        )
-
-        img_base64_decoded: str = img_base64.decode("utf-8")
-
-        image_data = {0: img_base64_decoded}
-
-        choices_images: dict[int, str] = {}
-        choices_texts: list[str] = []
-
-        choices_elements: list[Locator] = await self.checkbox_frame.locator(
-            '//div[class="challenge-answer"]',
-        ).all()
-
-        for index, choice in enumerate(choices_elements):
-            # Convert image to base64.
-            image_style: str | None = await choice.locator(
-                "div.image",
-            ).get_attribute("style")
-
-            if image_style is None:
-                return
-
-            url: str = re.split(r'[(")]', image_style)[2]
+        # Choices can be text only, so only those with an image url are downloaded.
+        choices_urls: dict[int, str] = {
+            index: url
+            for index, choice in enumerate(choices_info)
+            if (url := self.image_url(choice["style"])) is not None
+        }
 
-            img_base64: bytes = base64.b64encode(
-                requests.get(
-                    url,
-                    headers=headers,
-                ).content
+        # Download the example and all choice images concurrently.
+        try:
+            images_base64: list[str] = await asyncio.gather(
+                *[
+                    self.fetch_image_base64(url, headers)
+                    for url in [image_url, *choices_urls.values()]
+                ]
             )
+        except requests.RequestException:
+            # Don't spend API credit on a challenge whose images couldn't be fetched.
+            await self.refresh_challenge()
+            return
 
-            img_base64_decoded: str = img_base64.decode("utf-8")
-
-            # Get answer text.
-            choice_text: str | None = await choice.locator(
-                "div.text-content",
-            ).get_attribute("text")
-
-            if choice_text is None:
-                return
-
-            # Save choice information.
-            choices_images[index] = img_base64_decoded
-            choices_texts.append(choice_text)
+        image_data: dict[int, str] = {0: images_base64[0]}
+        choices_images: dict[int, str] = dict(zip(choices_urls, images_base64[1:]))
+        choices_texts: list[str] = [choice["text"].strip() for choice in choices_info]
 
         # Doing final formating for api call by adding mandatory fields.
         data_to_send = {
-            "target": "Select the most accurate description of the image.",
+            "target": self.target,
             "method": "hcaptcha_base64",
             "sitekey": "sitekey",
             "site": "site",
@@ -489,7 +674,9 @@ class Solver:
         }
 
         # Calling nocaptcha api.
-        r: Response = requests.post(
+        self.rounds += 1
+        r: Response = await asyncio.to_thread(
+            requests.post,
             url=self.API_URL,
             headers={
                 "Content-Type": "application/json",
@@ -501,10 +688,17 @@ class Solver:
         # If the api call was successful.
         if r.json()["status"] == "solved":
             # Get the solution. Should be only 1 element in the solution list.
-            solution: list[int] = r.json()["solution"]
+            try:
+                solution: list[int] = list(map(int, r.json()["solution"]))
+            except (TypeError, ValueError):
+                solution = []
+
+            if not solution or not 0 <= solution[0] < len(choices_info):
+                await self.refresh_challenge()
+                return
 
             # Clicking on the correct answer.
-            await choices_elements[solution[0]].click()
+            await choices.nth(solution[0]).click()
 
             button: Locator = self.checkbox_frame.locator(CAPTCHA_FINAL_BUTTON)
 
@@ -524,14 +718,7 @@ class Solver:
                 await self.solve_hcaptcha_multi()
 
         elif r.json()["status"] in ["skip", "error"]:
-            refresh_button = self.checkbox_frame.locator(CAPTCHA_REFRESH_BUTTON)
-
-            if not refresh_button:
-                return
-
-            refresh_button.click()
-
-            await self.page.wait_for_timeout(1000)
+            await self.refresh_challenge()
 
         return
 
@@ -579,9 +766,30 @@ class Solver:
         Returns:
             bool: True if the captcha was solved, False otherwise.
         """
+        self.reset()
+
         # Save the page object.
         self.page = page
 
+        started: float = time.monotonic()
+
+        try:
+            return await self.solve_page()
+        finally:
+            self.release()
+
+            if self.soak is not None:
+                self.soak.record(time.monotonic() - started)
+
+    async def solve_page(
+        self,
+    ) -> bool:
+        """
+        Keeps solving challenges on the saved page until the captcha is gone.
+
+        Returns:
+            bool: True if the captcha was solved, False otherwise.
+        """
         self.user_agent = await self.page.evaluate("() => navigator.userAgent")
 
         while not self.solved:
@@ -591,30 +799,40 @@ class Solver:
 
             await self.page.wait_for_timeout(1500)
 
-            # If captcha is not visible it means it has been solved.
+            # If a challenge was shown and is now gone, it has been solved.
+            # If only the checkbox was clicked, the challenge may still be loading,
+            # so trust the checkbox itself. Otherwise the captcha may not have loaded yet.
             if not await self.is_captcha_visible():
+                self.solved = self.captcha_is_open or (
+                    self.checkbox_clicked and await self.is_checkbox_checked()
+                )
                 break
 
+            # A challenge is still showing, so the previous attempt failed.
+            self.finish_attempt(solved=False)
+
             self.captcha_is_open = True
 
             # Identify the type of captcha.
             await self.identify_challenge()
 
+            # Refresh low-yield prompts before spending anything on them.
+            if self.stats.should_skip(self.target, self.captcha_type):
+                self.stats.record_skip(self.target, self.captcha_type)
+                await self.refresh_challenge()
+                continue
+
+            self.start_attempt()
+
             match self.captcha_type:
                 case 0:
                     await self.solve_hcaptcha_grid()
                 case 1:
                     await self.solve_hcaptcha_bbox()
                 case 2:
-                    # TODO - Still needs testing. For now, just skip challenge and go again.
-                    # await self.solve_hcaptcha_multi()
-                    refresh_button = self.checkbox_frame.locator(CAPTCHA_REFRESH_BUTTON)
-
-                    if not refresh_button:
-                        return
-
-                    refresh_button.click()
+                    await self.solve_hcaptcha_multi()
 
-                    self.page.wait_for_timeout(1000)
+        if self.solved:
+            self.finish_attempt(solved=True)
 
         return self.solved
@@ -0,0 +1,255 @@
+import json
+import logging
+import os
+import random
+import re
+import tempfile
+from dataclasses import asdict, dataclass
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class PromptRecord:
+    attempts: int = 0
+    solves: int = 0
+    rounds: int = 0
+    latency: float = 0.0
+    skips: int = 0
+
+    @property
+    def solve_rate(self) -> float:
+        return self.solves / self.attempts if self.attempts else 0.0
+
+    @property
+    def mean_rounds(self) -> float:
+        return self.rounds / self.attempts if self.attempts else 0.0
+
+    @property
+    def mean_latency(self) -> float:
+        return self.latency / self.attempts if self.attempts else 0.0
+
+
+class PromptStats:
+    """
+    Statistics store keyed by the normalized captcha target and challenge type.
+    Tracks solve rate, rounds needed and latency of every attempt, and decides
+    whether a prompt is worth spending an image download and an API call on.
+
+    The store is shared only within one process. Processes pointing at the same
+    file do not merge their statistics: the last one to save wins.
+    """
+
+    _shared: dict[str | None, "PromptStats"] = {}
+
+    def __init__(
+        self,
+        path: str | None = None,
+        min_attempts: int = 5,
+        min_solve_rate: float = 0.2,
+        explore_rate: float = 0.1,
+        save_every: int = 20,
+    ) -> None:
+        """
+        Initializes the store and loads previous statistics from disk if a path is given.
+
+        Args:
+            path (str | None): JSON file where statistics are persisted between runs.
+            min_attempts (int): Attempts needed on a prompt before it can be skipped.
+            min_solve_rate (float): Prompts solved less often than this are refreshed right away.
+            explore_rate (float): Chance of attempting a low-yield prompt anyway, so its stats keep updating.
+            save_every (int): Number of updates between saves. The rest is saved by save().
+        """
+        self.path = path
+        self.min_attempts = min_attempts
+        self.min_solve_rate = min_solve_rate
+        self.explore_rate = explore_rate
+        self.save_every = save_every
+        self.records: dict[str, PromptRecord] = {}
+        self.unsaved: int = 0
+
+        self.load()
+
+    @classmethod
+    def shared(
+        cls,
+        path: str | None = None,
+        **options,
+    ) -> "PromptStats":
+        """
+        Returns the store shared by every solver using the same path.
+        Options such as min_solve_rate are used to build the store, or update it if it already exists.
+
+        Args:
+            path (str | None): JSON file where statistics are persisted between runs.
+            **options: Any of min_attempts, min_solve_rate, explore_rate and save_every.
+
+        Returns:
+            PromptStats: The shared store for that path.
+        """
+        if path not in cls._shared:
+            cls._shared[path] = cls(path, **options)
+            return cls._shared[path]
+
+        store: PromptStats = cls._shared[path]
+
+        for name, value in options.items():
+            if name not in ("min_attempts", "min_solve_rate", "explore_rate", "save_every"):
+                raise TypeError(f"Unknown PromptStats option: {name}")
+
+            setattr(store, name, value)
+
+        return store
+
+    @staticmethod
+    def key(
+        target: str,
+        captcha_type: int | None,
+    ) -> str:
+        """
+        Builds the key of a prompt. Case, whitespace and trailing punctuation are ignored.
+
+        Args:
+            target (str): The captcha prompt text.
+            captcha_type (int | None): The type of captcha challenge.
+
+        Returns:
+            str: The key used in the store.
+        """
+        target = re.sub(r"\s+", " ", target.lower()).strip().rstrip(".:!?")
+
+        return f"{captcha_type}:{target}"
+
+    def get(
+        self,
+        target: str,
+        captcha_type: int | None,
+    ) -> PromptRecord:
+        """
+        Gets the record of a prompt, creating it if it doesn't exist.
+        """
+        return self.records.setdefault(self.key(target, captcha_type), PromptRecord())
+
+    def should_skip(
+        self,
+        target: str,
+        captcha_type: int | None,
+    ) -> bool:
+        """
+        Checks if a prompt has a low enough yield to be refreshed before acquiring any image.
+
+        Returns:
+            bool: True if the prompt should be refreshed right away, False otherwise.
+        """
+        record: PromptRecord | None = self.records.get(self.key(target, captcha_type))
+
+        if record is None or record.attempts < self.min_attempts:
+            return False
+
+        if record.solve_rate >= self.min_solve_rate:
+            return False
+
+        # Still try it once in a while in case the API got better at it.
+        return random.random() >= self.explore_rate
+
+    def record_attempt(
+        self,
+        target: str,
+        captcha_type: int | None,
+        solved: bool,
+        rounds: int,
+        latency: float,
+    ) -> None:
+        """
+        Records the outcome of an attempt on a prompt.
+
+        Args:
+            target (str): The captcha prompt text.
+            captcha_type (int | None): The type of captcha challenge.
+            solved (bool): Whether the captcha was solved.
+            rounds (int): Number of API calls made for this prompt.
+            latency (float): Seconds spent on this prompt.
+        """
+        record: PromptRecord = self.get(target, captcha_type)
+        record.attempts += 1
+        record.solves += int(solved)
+        record.rounds += rounds
+        record.latency += latency
+
+        self.updated()
+
+    def record_skip(
+        self,
+        target: str,
+        captcha_type: int | None,
+    ) -> None:
+        """
+        Records that a prompt was refreshed without attempting it.
+        """
+        self.get(target, captcha_type).skips += 1
+
+        self.updated()
+
+    def updated(
+        self,
+    ) -> None:
+        """
+        Counts an update and saves the store once every save_every updates.
+        """
+        self.unsaved += 1
+
+        if self.unsaved >= self.save_every:
+            self.save()
+
+    def load(
+        self,
+    ) -> None:
+        """
+        Loads the statistics from the JSON file, if there is one.
+        An unreadable file is ignored and the store starts empty.
+        """
+        if not self.path or not os.path.exists(self.path):
+            return
+
+        try:
+            with open(self.path, encoding="utf-8") as file:
+                data: dict[str, dict] = json.load(file)
+
+            self.records = {key: PromptRecord(**value) for key, value in data.items()}
+        except (OSError, ValueError, TypeError, AttributeError) as error:
+            logger.warning("Ignoring unreadable stats file %s: %s", self.path, error)
+            self.records = {}
+
+    def save(
+        self,
+    ) -> None:
+        """
+        Saves the statistics to the JSON file, if a path was given.
+        """
+        self.unsaved = 0
+
+        if not self.path:
+            return
+
+        # Write to a unique temporary file first so a crash or a concurrent save
+        # never leaves a truncated or mixed file behind.
+        temp_path: str | None = None
+
+        try:
+            temp_fd, temp_path = tempfile.mkstemp(
+                dir=os.path.dirname(os.path.abspath(self.path)),
+                suffix=".tmp",
+            )
+
+            with os.fdopen(temp_fd, "w", encoding="utf-8") as file:
+                json.dump(
+                    {key: asdict(value) for key, value in self.records.items()},
+                    file,
+                )
+
+            os.replace(temp_path, self.path)
+        except OSError as error:
+            logger.warning("Could not save stats file %s: %s", self.path, error)
+
+            if temp_path is not None and os.path.exists(temp_path):
+                os.remove(temp_path)
@@ -0,0 +1,114 @@
+import tracemalloc
+
+import pytest
+
+from nocaptchaai_playwright import soak
+from nocaptchaai_playwright.soak import SoakMonitor
+
+
+@pytest.fixture(autouse=True)
+def clean_tracing(monkeypatch):
+    if tracemalloc.is_tracing():
+        tracemalloc.stop()
+
+    monkeypatch.setattr(soak, "_monitors", 0)
+    monkeypatch.setattr(soak, "_started_tracing", False)
+
+    yield
+
+    if tracemalloc.is_tracing():
+        tracemalloc.stop()
+
+
+def test_tracing_stops_after_last_monitor_closes() -> None:
+    first = SoakMonitor()
+    second = SoakMonitor()
+
+    assert tracemalloc.is_tracing()
+
+    first.close()
+
+    assert tracemalloc.is_tracing()
+
+    second.close()
+
+    assert not tracemalloc.is_tracing()
+
+
+def test_tracing_started_elsewhere_is_never_stopped() -> None:
+    tracemalloc.start()
+
+    first = SoakMonitor()
+    second = SoakMonitor()
+    first.close()
+    second.close()
+
+    assert tracemalloc.is_tracing()
+
+
+def test_close_is_idempotent() -> None:
+    first = SoakMonitor()
+    second = SoakMonitor()
+    first.close()
+    first.close()
+
+    assert tracemalloc.is_tracing()
+    assert second.report() == {"solves": 0}
+
+    second.close()
+
+    assert not tracemalloc.is_tracing()
+
+
+def test_latency_windows_are_bounded() -> None:
+    monitor = SoakMonitor(window=3)
+
+    for latency in range(10):
+        monitor.record(float(latency))
+
+    report: dict[str, float] = monitor.report()
+
+    assert monitor.first_latencies == [0.0, 1.0, 2.0]
+    assert list(monitor.recent_latencies) == [7.0, 8.0, 9.0]
+    assert report["solves"] == 10
+    assert report["first_latency"] == 1.0
+    assert report["recent_latency"] == 8.0
+    assert report["latency_drift"] == 7.0
+
+    monitor.close()
+
+
+def test_memory_growth_excludes_baseline_solve() -> None:
+    monitor = SoakMonitor()
+    kept: list[bytearray] = []
+
+    for _ in range(3):
+        kept.append(bytearray(100_000))
+        monitor.record(1.0)
+
+    report: dict[str, float] = monitor.report()
+
+    assert report["memory_growth"] >= 200_000
+    assert report["memory_growth_per_solve"] == report["memory_growth"] / 2
+
+    monitor.close()
+
+
+def test_report_is_none_without_tracing() -> None:
+    monitor = SoakMonitor()
+    monitor.record(1.0)
+    tracemalloc.stop()
+
+    assert monitor.report() is None
+
+
+def test_report_takes_baseline_if_never_sampled() -> None:
+    monitor = SoakMonitor()
+    tracemalloc.stop()
+    monitor.record(1.0)
+    tracemalloc.start()
+
+    report: dict[str, float] = monitor.report()
+
+    assert report["memory_growth"] == 0
+    assert report["solves"] == 1
@@ -0,0 +1,123 @@
+import asyncio
+
+import pytest
+
+pytest.importorskip("playwright")
+pytest.importorskip("requests")
+
+from nocaptchaai_playwright.stats import PromptStats  # noqa: E402
+from nocaptchaai_playwright.solver import Solver  # noqa: E402
+
+TARGET: str = "Please click each image containing a cat"
+
+
+class StubPage:
+    async def evaluate(self, expression: str) -> str:
+        return "stub-agent"
+
+    async def wait_for_timeout(self, timeout: float) -> None:
+        return None
+
+
+@pytest.fixture
+def solver(monkeypatch) -> Solver:
+    solver = Solver(api_key="key", api_url="https://pro.nocaptchaai.com/api/solve", stats=PromptStats())
+    monkeypatch.setattr(solver, "has_balance", lambda: True)
+
+    return solver
+
+
+def show_challenge_once(solver: Solver, monkeypatch) -> list[int]:
+    """
+    Makes the captcha show one grid challenge per solve, solved by a single API round.
+    Returns the list of grid solve calls.
+    """
+    grid_calls: list[int] = []
+
+    async def is_captcha_visible() -> bool:
+        if solver.rounds:
+            return False
+
+        solver.checkbox_frame = object()
+        solver.target = TARGET
+        return True
+
+    async def solve_hcaptcha_grid() -> None:
+        grid_calls.append(1)
+        solver.rounds += 1
+
+    monkeypatch.setattr(solver, "is_captcha_visible", is_captcha_visible)
+    monkeypatch.setattr(solver, "solve_hcaptcha_grid", solve_hcaptcha_grid)
+
+    return grid_calls
+
+
+@pytest.mark.parametrize(
+    "style, url",
+    [
+        ('background: url("https://imgs.hcaptcha.com/a.jpg") 50% 50%', "https://imgs.hcaptcha.com/a.jpg"),
+        ("background: url('https://imgs.hcaptcha.com/a.jpg')", "https://imgs.hcaptcha.com/a.jpg"),
+        ("background: url(https://imgs.hcaptcha.com/a.jpg)", "https://imgs.hcaptcha.com/a.jpg"),
+        ("background: rgb(255, 255, 255)", None),
+        ("", None),
+        (None, None),
+    ],
+)
+def test_image_url(style: str | None, url: str | None) -> None:
+    assert Solver.image_url(style) == url
+
+
+def test_solver_can_be_reused(solver: Solver, monkeypatch) -> None:
+    grid_calls: list[int] = show_challenge_once(solver, monkeypatch)
+
+    assert asyncio.run(solver.solve(StubPage())) is True
+    assert asyncio.run(solver.solve(StubPage())) is True
+
+    assert len(grid_calls) == 2
+    assert solver.stats.get(TARGET, 0).solves == 2
+
+
+def test_solve_releases_page_and_frame(solver: Solver, monkeypatch) -> None:
+    show_challenge_once(solver, monkeypatch)
+
+    asyncio.run(solver.solve(StubPage()))
+
+    assert solver.page is None
+    assert solver.checkbox_frame is None
+
+
+def test_context_manager_releases_solver(monkeypatch) -> None:
+    async def run() -> Solver:
+        async with Solver(stats=PromptStats(), soak=True) as solver:
+            solver.page = StubPage()
+
+        return solver
+
+    solver: Solver = asyncio.run(run())
+
+    assert solver.page is None
+    assert solver.soak.closed
+
+
+def test_no_captcha_seen_is_not_solved(solver: Solver, monkeypatch) -> None:
+    async def is_captcha_visible() -> bool:
+        return False
+
+    monkeypatch.setattr(solver, "is_captcha_visible", is_captcha_visible)
+
+    assert asyncio.run(solver.solve(StubPage())) is False
+
+
+@pytest.mark.parametrize("checked", [True, False])
+def test_clicked_checkbox_is_solved_only_if_checked(solver: Solver, monkeypatch, checked: bool) -> None:
+    async def is_captcha_visible() -> bool:
+        solver.checkbox_clicked = True
+        return False
+
+    async def is_checkbox_checked() -> bool:
+        return checked
+
+    monkeypatch.setattr(solver, "is_captcha_visible", is_captcha_visible)
+    monkeypatch.setattr(solver, "is_checkbox_checked", is_checkbox_checked)
+
+    assert asyncio.run(solver.solve(StubPage())) is checked
@@ -0,0 +1,146 @@
+import json
+
+import pytest
+
+from nocaptchaai_playwright import stats as stats_module
+from nocaptchaai_playwright.stats import PromptRecord, PromptStats
+
+TARGET: str = "Please click each image containing a cat."
+
+
+def fail(store: PromptStats, times: int) -> None:
+    for _ in range(times):
+        store.record_attempt(TARGET, 0, solved=False, rounds=1, latency=2.0)
+
+
+def test_key_ignores_case_whitespace_and_trailing_punctuation() -> None:
+    assert PromptStats.key("  Please CLICK each\nimage   containing a cat. ", 0) == (
+        "0:please click each image containing a cat"
+    )
+
+
+def test_key_depends_on_captcha_type() -> None:
+    assert PromptStats.key(TARGET, 0) != PromptStats.key(TARGET, 1)
+
+
+def test_unknown_prompt_is_not_skipped() -> None:
+    assert not PromptStats().should_skip(TARGET, 0)
+
+
+def test_prompt_is_not_skipped_before_min_attempts(monkeypatch) -> None:
+    monkeypatch.setattr(stats_module.random, "random", lambda: 0.99)
+    store = PromptStats(min_attempts=5)
+    fail(store, 4)
+
+    assert not store.should_skip(TARGET, 0)
+
+
+def test_low_yield_prompt_is_skipped(monkeypatch) -> None:
+    monkeypatch.setattr(stats_module.random, "random", lambda: 0.99)
+    store = PromptStats(min_attempts=5)
+    fail(store, 5)
+
+    assert store.should_skip(TARGET.upper(), 0)
+    assert not store.should_skip(TARGET, 1)
+
+
+def test_good_prompt_is_not_skipped(monkeypatch) -> None:
+    monkeypatch.setattr(stats_module.random, "random", lambda: 0.99)
+    store = PromptStats(min_attempts=5, min_solve_rate=0.2)
+    fail(store, 4)
+    store.record_attempt(TARGET, 0, solved=True, rounds=1, latency=2.0)
+
+    assert store.should_skip(TARGET, 0) is False
+
+
+def test_low_yield_prompt_is_explored(monkeypatch) -> None:
+    monkeypatch.setattr(stats_module.random, "random", lambda: 0.05)
+    store = PromptStats(min_attempts=5, explore_rate=0.1)
+    fail(store, 5)
+
+    assert not store.should_skip(TARGET, 0)
+
+
+def test_record_attempt_updates_record() -> None:
+    store = PromptStats()
+    store.record_attempt(TARGET, 0, solved=True, rounds=2, latency=3.0)
+    store.record_attempt(TARGET, 0, solved=False, rounds=1, latency=1.0)
+    store.record_skip(TARGET, 0)
+
+    record: PromptRecord = store.get(TARGET, 0)
+
+    assert record.attempts == 2
+    assert record.solve_rate == 0.5
+    assert record.mean_rounds == 1.5
+    assert record.mean_latency == 2.0
+    assert record.skips == 1
+
+
+def test_save_load_round_trip(tmp_path) -> None:
+    path: str = str(tmp_path / "stats.json")
+    store = PromptStats(path)
+    store.record_attempt(TARGET, 0, solved=True, rounds=2, latency=3.0)
+    store.record_skip(TARGET, 1)
+    store.save()
+
+    loaded = PromptStats(path)
+
+    assert loaded.records == store.records
+    assert list(tmp_path.iterdir()) == [tmp_path / "stats.json"]
+
+
+def test_saves_every_n_updates(tmp_path) -> None:
+    path = tmp_path / "stats.json"
+    store = PromptStats(str(path), save_every=3)
+    fail(store, 2)
+
+    assert not path.exists()
+
+    fail(store, 1)
+
+    assert json.loads(path.read_text())[PromptStats.key(TARGET, 0)]["attempts"] == 3
+
+
+@pytest.mark.parametrize(
+    "content",
+    [
+        '{"0:cat": {"attempts": 1',
+        '{"0:cat": {"unknown": 1}}',
+        "[1, 2, 3]",
+    ],
+)
+def test_unreadable_file_starts_empty(tmp_path, content: str) -> None:
+    path = tmp_path / "stats.json"
+    path.write_text(content)
+
+    assert PromptStats(str(path)).records == {}
+
+
+def test_shared_returns_same_store_per_path(tmp_path, monkeypatch) -> None:
+    monkeypatch.setattr(PromptStats, "_shared", {})
+    path: str = str(tmp_path / "stats.json")
+
+    assert PromptStats.shared(path) is PromptStats.shared(path)
+    assert PromptStats.shared(path) is not PromptStats.shared(None)
+
+
+def test_shared_forwards_options(tmp_path, monkeypatch) -> None:
+    monkeypatch.setattr(PromptStats, "_shared", {})
+    path: str = str(tmp_path / "stats.json")
+
+    store = PromptStats.shared(path, min_attempts=3, min_solve_rate=0.5)
+
+    assert (store.min_attempts, store.min_solve_rate) == (3, 0.5)
+
+    PromptStats.shared(path, explore_rate=0.0)
+
+    assert store.explore_rate == 0.0
+    assert store.min_attempts == 3
+
+
+def test_shared_rejects_unknown_option(monkeypatch) -> None:
+    monkeypatch.setattr(PromptStats, "_shared", {})
+    PromptStats.shared(None)
+
+    with pytest.raises(TypeError):
+        PromptStats.shared(None, path="other.json")